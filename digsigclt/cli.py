@@ -5,7 +5,7 @@ from ipaddress import ip_address
 from logging import DEBUG, INFO, basicConfig
 from pathlib import Path
 
-from digsigclt.common import CHUNK_SIZE, LOG_FORMAT, LOGGER
+from digsigclt.common import LOG_FORMAT, LOGGER
 from digsigclt.exceptions import NoAddressFound
 from digsigclt.network import discover_address
 from digsigclt.server import spawn
@@ -40,14 +40,6 @@ def get_args() -> Namespace:
         default=Path.cwd(),
         help="sets the target directory",
     )
-    parser.add_argument(
-        "-c",
-        "--chunk-size",
-        type=int,
-        default=CHUNK_SIZE,
-        metavar="bytes",
-        help="chunk size to use on file operations",
-    )
     parser.add_argument(
         "-v", "--verbose", action="store_true", help="turn on verbose logging"
     )
@@ -61,14 +53,14 @@ def main() -> int:
     basicConfig(level=DEBUG if args.verbose else INFO, format=LOG_FORMAT)
     LOGGER.debug('Target directory set to "%s".', args.directory)
 
+    if not args.directory.is_dir():
+        LOGGER.critical('Target directory "%s" does not exist.', args.directory)
+        return 3
+
     try:
         address = discover_address()
     except NoAddressFound:
         LOGGER.critical("No private network address found.")
         return 2
 
-    if args.directory.is_dir():
-        return spawn(Socket(address, args.port), args.directory, args.chunk_size)
-
-    LOGGER.critical('Target directory "%s" does not exist.', args.directory)
-    return 3
+    return spawn(Socket(address, args.port), args.directory)
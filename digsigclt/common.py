@@ -3,10 +3,28 @@
 from __future__ import annotations
 from hashlib import sha256
 from logging import getLogger
+from mmap import ACCESS_READ, PAGESIZE, mmap
+from os import fstat
+from os.path import basename
 from pathlib import Path
 from sys import argv
 from typing import IO
 
+try:
+    from hashlib import file_digest
+except ImportError:  # Added in Python 3.11.
+    file_digest = None
+
+try:
+    from mmap import MADV_SEQUENTIAL, MADV_WILLNEED
+except ImportError:  # Not available on Windows.
+    MADV_SEQUENTIAL = MADV_WILLNEED = None
+
+try:
+    from os import POSIX_FADV_SEQUENTIAL, posix_fadvise
+except ImportError:  # Not available on Windows and macOS.
+    POSIX_FADV_SEQUENTIAL = posix_fadvise = None
+
 
 __all__ = [
     "CHUNK_SIZE",
@@ -22,19 +40,47 @@ __all__ = [
 CHUNK_SIZE = 4 * 1024 * 1024  # Four Mebibytes.
 LOG_FORMAT = "[%(levelname)s] %(name)s: %(message)s"
 LOGFILE = Path("synclog.txt")
-LOGGER = getLogger(Path(argv[0]).name)
+LOGGER = getLogger(basename(argv[0]))
+# Copying an initialized hash is cheaper than creating one.
+SHA256 = sha256(usedforsecurity=False)
 
 
-def copy_file(src: IO, dst: IO, size: int, chunk_size: int = CHUNK_SIZE):
-    """Copy two files."""
+def copy_file(src: IO, dst: IO, size: int):
+    """Copy size bytes from one file to another.
+    Raise an EOFError if the source ends prematurely.
+    """
+
+    buffer = memoryview(bytearray(min(size, CHUNK_SIZE)))
 
     while size > 0:
-        size -= (bytes_ := min(size, chunk_size))
-        dst.write(src.read(bytes_))
+        if not (bytes_ := src.readinto(buffer[: min(size, CHUNK_SIZE)])):
+            raise EOFError(f"Premature end of file. {size} bytes missing.")
+
+        dst.write(buffer[:bytes_])
+        size -= bytes_
 
 
 def sha256sum(filename: Path | str) -> str:
     """Return an SHA-256 sum of the specified file."""
 
-    with open(filename, "rb") as file:
-        return sha256(file.read()).hexdigest()
+    with open(filename, "rb", buffering=0) as file:
+        if posix_fadvise is not None:
+            posix_fadvise(file.fileno(), 0, 0, POSIX_FADV_SEQUENTIAL)
+
+        if file_digest is not None:
+            return file_digest(file, SHA256.copy).hexdigest()
+
+        digest = SHA256.copy()
+
+        if fstat(file.fileno()).st_size < PAGESIZE:
+            digest.update(file.read())
+            return digest.hexdigest()
+
+        with mmap(file.fileno(), 0, access=ACCESS_READ) as view:
+            if MADV_SEQUENTIAL is not None:
+                view.madvise(MADV_SEQUENTIAL)
+                view.madvise(MADV_WILLNEED)
+
+            digest.update(view)
+
+        return digest.hexdigest()
@@ -1,6 +1,5 @@
 """Common exceptions."""
 
-from os import linesep
 from subprocess import CalledProcessError
 from typing import Iterable
 
@@ -25,7 +24,7 @@ class CalledProcessErrors(Exception):
         self.called_process_errors = list(called_process_errors)
 
     def __str__(self):
-        return linesep.join(map(str, self.called_process_errors))
+        return "\n".join(map(str, self.called_process_errors))
 
 
 class ManifestError(Exception):
@@ -1,10 +1,12 @@
 """Private network discovery."""
 
-from ipaddress import IPv4Network, IPv6Network, ip_address
+from ipaddress import IPv4Address, IPv4Network, IPv6Address, IPv6Network
+from time import monotonic, sleep
 from typing import Iterator
 
 from netifaces import AF_INET, AF_INET6, ifaddresses, interfaces
 
+from digsigclt.common import LOGGER
 from digsigclt.exceptions import NoAddressFound
 from digsigclt.types import IPAddress
 
@@ -15,27 +17,72 @@ __all__ = ["discover_address"]
 OPENVPN = IPv4Network("10.8.0.0/16")
 WIREGUARD = IPv6Network("fd56:1dda:8794:cb90::/64")
 NETWORKS = [OPENVPN, WIREGUARD]
+# Loopback and link-local addresses can never be on one of the networks.
+LOCAL_PREFIXES = ("127.", "169.254.", "fe80:")
+LOCALHOST6 = "::1"
 
 
 def get_addresses() -> Iterator[IPAddress]:
-    """Yield available IP addresses."""
+    """Yield available IP addresses, except for
+    loopback and link-local addresses.
+    """
 
     for interface in interfaces():
         if addresses := ifaddresses(interface):
             for ipv4addr in addresses.get(AF_INET, []):
-                yield ip_address(ipv4addr["addr"])
+                if is_candidate(address := ipv4addr["addr"]):
+                    yield IPv4Address(address)
 
             for ipv6addr in addresses.get(AF_INET6, []):
-                yield ip_address(ipv6addr["addr"])
+                if is_candidate(address := ipv6addr["addr"]):
+                    yield IPv6Address(address)
 
 
-def discover_address() -> IPAddress:
-    """Periodically retry to get an address on the network."""
+def is_candidate(address: str) -> bool:
+    """Check whether the address string may be on one of the networks."""
 
-    if addresses := list(get_addresses()):
-        for network in NETWORKS:
-            for address in addresses:
-                if address in network:
+    return not address.startswith(LOCAL_PREFIXES) and address != LOCALHOST6
+
+
+def get_address() -> IPAddress:
+    """Return the first address on the most preferred network.
+    Stops enumerating addresses once one on the first network is found.
+    """
+
+    candidates = {}
+
+    for address in get_addresses():
+        for priority, network in enumerate(NETWORKS):
+            if address in network:
+                if priority == 0:
                     return address
 
+                candidates.setdefault(priority, address)
+                break
+
+    if candidates:
+        return candidates[min(candidates)]
+
     raise NoAddressFound()
+
+
+def discover_address(
+    *, interval: float = 1, max_interval: float = 30, timeout: float = 60
+) -> IPAddress:
+    """Periodically retry to get an address on the network,
+    doubling the interval between attempts up to max_interval.
+    """
+
+    deadline = monotonic() + timeout
+
+    while True:
+        try:
+            return get_address()
+        except NoAddressFound:
+            if (remaining := deadline - monotonic()) <= 0:
+                raise
+
+        delay = min(interval, remaining)
+        LOGGER.debug("No address found. Retrying in %.1f seconds.", delay)
+        sleep(delay)
+        interval = min(interval * 2, max_interval)
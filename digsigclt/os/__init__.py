@@ -1,12 +1,18 @@
 """OS-independent commands."""
 
+from __future__ import annotations
 from os import name
 from typing import Any
 
 from digsigclt.common import LOGGER
-from digsigclt.os import nt, posix
 from digsigclt.types import Screenshot
 
+# Only import the commands of the running platform.
+if name == "posix":
+    from digsigclt.os import posix
+elif name == "nt":
+    from digsigclt.os import nt
+
 
 __all__ = [
     "application_set_mode",
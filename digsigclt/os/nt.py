@@ -1,13 +1,18 @@
 """Windows NT commands."""
 
-from subprocess import check_call
-
 from digsigclt.os.common import command
 
+try:
+    from winsound import Beep
+except ImportError:  # Only available on Windows.
+    Beep = None
+
 
 __all__ = ["beep", "ping", "reboot"]
 
 
+BEEP_DURATION = 200  # Milliseconds.
+BEEP_FREQUENCY = 1000  # Hertz.
 PING = "C:\\Windows\\System32\\ping.exe"
 REBOOT = "C:\\Windows\\System32\\shutdown.exe"
 
@@ -15,7 +20,8 @@ REBOOT = "C:\\Windows\\System32\\shutdown.exe"
 def beep() -> int:
     """Perform a speaker beep to identify the system."""
 
-    return check_call("@echo \x07", shell=True)
+    Beep(BEEP_FREQUENCY, BEEP_DURATION)
+    return 0
 
 
 @command()
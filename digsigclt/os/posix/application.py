@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 from enum import Enum
+from os.path import isfile
 from pathlib import Path
 from typing import NamedTuple
 
 from digsigclt.os.common import commands
-from digsigclt.os.posix.common import sudo, systemctl, is_active, is_enabled
+from digsigclt.os.posix.common import ACTIVE_STATES, ENABLED_STATES
+from digsigclt.os.posix.common import sudo, systemctl, unit_properties
 from digsigclt.os.posix.pacman import package_version
 from digsigclt.types import ApplicationMode, Command
 
@@ -64,13 +66,30 @@ class Applications(Application, Enum):
     OFF = Application("off", ApplicationMode.OFF)
 
 
+UNIT_APPLICATIONS = tuple(
+    application for application in Applications if application.unit
+)
+UNITS = tuple(application.unit for application in UNIT_APPLICATIONS)
+DISABLE_COMMANDS = tuple(
+    Command(tuple(sudo(systemctl("disable", "--now", unit))), exit_ok=frozenset({1}))
+    for unit in UNITS
+)
+ENABLE_COMMANDS = {
+    unit: Command(tuple(sudo(systemctl("enable", "--now", unit)))) for unit in UNITS
+}
+UNIT_FILES = {
+    application: str(SERVICES_DIR / application.unit)
+    for application in UNIT_APPLICATIONS
+    if application.mode == ApplicationMode.PRODUCTIVE
+}
+
+
 def get_preferred_application() -> Application:
     """Return the preferred service on the system."""
 
-    for application in Applications:
-        if application.unit and application.mode == ApplicationMode.PRODUCTIVE:
-            if SERVICES_DIR.joinpath(application.unit).is_file():
-                return application
+    for application, unit_file in UNIT_FILES.items():
+        if isfile(unit_file):
+            return application
 
     raise ValueError("No productive application installed.")
 
@@ -97,22 +116,21 @@ def get_application(mode: ApplicationMode) -> Application:
 def set_mode(mode: str) -> int:
     """Set application mode."""
 
-    for application in Applications:
-        if unit := application.unit:
-            yield Command(sudo(systemctl("disable", "--now", unit)), exit_ok={1})
+    yield from DISABLE_COMMANDS
 
     if unit := get_application(ApplicationMode[mode.upper()]).unit:
-        yield Command(sudo(systemctl("enable", "--now", unit)))
+        yield ENABLE_COMMANDS[unit]
 
 
 def status() -> Application:
     """Return the current mode."""
 
-    for application in Applications:
+    states = unit_properties(UNITS, "UnitFileState", "ActiveState")
+
+    for application, state in zip(UNIT_APPLICATIONS, states):
         if (
-            application.unit
-            and is_enabled(application.unit)
-            and is_active(application.unit)
+            state.get("UnitFileState") in ENABLED_STATES
+            and state.get("ActiveState") in ACTIVE_STATES
         ):
             return application
 
@@ -3,12 +3,14 @@
 from json import loads
 from os import linesep
 from pathlib import Path
-from subprocess import CalledProcessError, check_call, check_output
+from subprocess import check_output
 from typing import Iterable, Iterator
 
 
 __all__ = [
+    "ACTIVE_STATES",
     "ADMIN_USERS",
+    "ENABLED_STATES",
     "LIST_SESSIONS_JSON",
     "PACMAN_LOCKFILE",
     "SCROT",
@@ -18,12 +20,22 @@ __all__ = [
     "list_journal",
     "list_sessions",
     "logged_in_users",
-    "is_active",
-    "is_enabled",
+    "unit_properties",
 ]
 
 
+# States for which "systemctl is-active" and "systemctl is-enabled" succeed.
+ACTIVE_STATES = {"active", "reloading", "refreshing"}
 ADMIN_USERS = {"homeinfo", "root"}
+ENABLED_STATES = {
+    "alias",
+    "enabled",
+    "enabled-runtime",
+    "generated",
+    "indirect",
+    "static",
+    "transient",
+}
 SUDO = "/usr/bin/sudo"
 SYSTEMCTL = "/usr/bin/systemctl"
 JOURNALCTL = "/usr/bin/journalctl"
@@ -81,23 +93,16 @@ def logged_in_users() -> set[str]:
     return {session["user"] for session in list_sessions()}
 
 
-def is_enabled(unit: str) -> bool:
-    """Check whether the unit is enabled."""
+def unit_properties(units: Iterable[str], *properties: str) -> list[dict[str, str]]:
+    """Return the given properties of the respective units
+    in the order of the units, using a single systemctl call.
+    """
 
-    try:
-        check_call(systemctl("is-enabled", unit, "--quiet"))
-    except CalledProcessError:
-        return False
-
-    return True
-
-
-def is_active(unit: str) -> bool:
-    """Check whether the unit is running."""
-
-    try:
-        check_call(systemctl("is-active", unit, "--quiet"))
-    except CalledProcessError:
-        return False
-
-    return True
+    output = check_output(
+        systemctl("show", f"--property={','.join(properties)}", "--", *units),
+        text=True,
+    )
+    return [
+        dict(line.split("=", 1) for line in block.splitlines())
+        for block in output.strip().split("\n\n")
+    ]
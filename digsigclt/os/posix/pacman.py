@@ -42,4 +42,4 @@ def package_version(package: str) -> str | None:
     except CalledProcessError:
         return None
 
-    return result.stdout.strip().split()[1]
+    return result.stdout.partition(" ")[2].rstrip()
@@ -1,23 +1,47 @@
 """Common constants."""
 
-from contextlib import suppress
+from json import dumps
 from pathlib import Path
+from threading import Lock as _Lock
 
-from digsigclt.lock import Lock, Locked
-from digsigclt.sync import gen_manifest
+from digsigclt.lock import Lock
+from digsigclt.sync import fast_manifest, gen_manifest
+from digsigclt.types import Fingerprint
 
 
-__all__ = ["LOCK", "get_manifest"]
+__all__ = ["LOCK", "MANIFEST_LOCK", "get_manifest", "invalidate_manifest"]
 
 
-LOCK = Lock()
+LOCK = Lock()  # Rejects concurrent syncs.
+MANIFEST_LOCK = _Lock()  # Queues manifest generation and extraction.
+_MANIFEST_CACHE: tuple[dict[str, Fingerprint], bytes] | None = None
 
 
-def get_manifest(directory: Path, chunk_size: int) -> list | None:
-    """Return the manifest."""
+def get_manifest(directory: Path) -> bytes:
+    """Return the JSON-encoded manifest."""
 
-    with suppress(Locked):
-        with LOCK:
-            return list(gen_manifest(directory, chunk_size=chunk_size))
+    with MANIFEST_LOCK:
+        return _get_manifest(directory)
 
-    return None
+
+def invalidate_manifest() -> None:
+    """Discard the cached manifest."""
+
+    global _MANIFEST_CACHE
+    _MANIFEST_CACHE = None
+
+
+def _get_manifest(directory: Path) -> bytes:
+    """Return the cached manifest, if the directory did not change,
+    otherwise generate a new manifest and cache it.
+    """
+
+    global _MANIFEST_CACHE
+    fingerprint = fast_manifest(directory)
+
+    if _MANIFEST_CACHE is not None and _MANIFEST_CACHE[0] == fingerprint:
+        return _MANIFEST_CACHE[1]
+
+    manifest = dumps(list(gen_manifest(directory, fingerprint=fingerprint))).encode()
+    _MANIFEST_CACHE = (fingerprint, manifest)
+    return manifest
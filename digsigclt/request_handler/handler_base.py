@@ -1,7 +1,7 @@
 """Request handler base"""
 
 from http.server import BaseHTTPRequestHandler
-from json import loads
+from json import dumps, loads
 from typing import Any
 
 from digsigclt.types import Payload, ResponseContent
@@ -13,6 +13,9 @@ __all__ = ["HTTPRequestHandlerBase"]
 class HTTPRequestHandlerBase(BaseHTTPRequestHandler):
     """Extension of the BaseHTTPRequestHandler with convenience methods."""
 
+    protocol_version = "HTTP/1.1"
+    timeout = 60  # Close idle or dropped keep-alive connections.
+
     @property
     def content_length(self) -> int:
         """Return the content length."""
@@ -37,6 +40,7 @@ class HTTPRequestHandlerBase(BaseHTTPRequestHandler):
         """Send the respective response content."""
         self.send_response(status_code)
         self.send_header("Content-Type", content.content_type)
+        self.send_header("Content-Length", str(len(content.payload)))
         self.end_headers()
         self.wfile.write(content.payload)
 
@@ -48,3 +52,30 @@ class HTTPRequestHandlerBase(BaseHTTPRequestHandler):
             ResponseContent.from_payload(payload, content_type=content_type),
             status_code,
         )
+
+    def send_json(self, value: Any, status_code: int) -> None:
+        """Send the respective JSON value."""
+        self.send_content(
+            ResponseContent(dumps(value).encode(), "application/json"), status_code
+        )
+
+    def send_text(self, text: str, status_code: int) -> None:
+        """Send the respective plain text."""
+        self.send_content(ResponseContent(text.encode(), "text/plain"), status_code)
+
+    def send_json_object(
+        self, members: dict[str, Any], status_code: int, *, encoded: dict[str, bytes]
+    ) -> None:
+        """Send a JSON object of the respective members,
+        preceded by members whose values are already encoded.
+        """
+        encoded = {
+            **encoded,
+            **{key: dumps(value).encode() for key, value in members.items()},
+        }
+        payload = b",".join(
+            dumps(key).encode() + b":" + value for key, value in encoded.items()
+        )
+        self.send_content(
+            ResponseContent(b"{" + payload + b"}", "application/json"), status_code
+        )
@@ -13,7 +13,8 @@ from digsigclt.rpc import COMMANDS, http_screenshot
 from digsigclt.os import get_preferred_application, sysinfo
 from digsigclt.sync import update
 
-from digsigclt.request_handler.common import LOCK, get_manifest
+from digsigclt.request_handler.common import LOCK, MANIFEST_LOCK
+from digsigclt.request_handler.common import get_manifest, invalidate_manifest
 from digsigclt.request_handler.handler_base import HTTPRequestHandlerBase
 
 
@@ -25,9 +26,8 @@ class HTTPRequestHandler(HTTPRequestHandlerBase):
 
     last_sync = None
 
-    def __init_subclass__(cls, *, chunk_size: int, directory: Path):
+    def __init_subclass__(cls, *, directory: Path):
         """Initialize the subclass."""
-        cls.chunk_size = chunk_size
         cls.directory = directory
 
     @property
@@ -49,7 +49,7 @@ class HTTPRequestHandler(HTTPRequestHandlerBase):
             self.send_screenshot()
             return
 
-        self.send_data("Invalid path.", 404)
+        self.send_text("Invalid path.", 404)
 
     def do_POST(self) -> None:
         """Retrieve and updates digital signage data."""
@@ -61,7 +61,12 @@ class HTTPRequestHandler(HTTPRequestHandlerBase):
         except Locked:
             text = "Synchronization already in progress."
             LOGGER.error(text)
-            self.send_data(text, 503)
+            self.close_connection = True  # Request body was not read.
+            self.send_text(text, 503)
+        except EOFError as error:
+            LOGGER.error(error)
+            self.close_connection = True
+            self.send_text("Incomplete request body.", 400)
 
     def do_PUT(self) -> None:
         """Handle special commands."""
@@ -71,7 +76,7 @@ class HTTPRequestHandler(HTTPRequestHandlerBase):
             self.handle_put_request()
         except RequestError as error:
             LOGGER.error(error.message)
-            self.send_data(error.message, error.status_code)
+            self.send_text(error.message, error.status_code)
 
     def handle_put_request(self) -> None:
         """Handle incoming PUT requests."""
@@ -116,7 +121,7 @@ class HTTPRequestHandler(HTTPRequestHandlerBase):
         with suppress(NotImplementedError):
             json.update(sysinfo())
 
-        self.send_data(json, 200)
+        self.send_json(json, 200)
 
     def log_sync(self) -> None:
         """Log the synchronization."""
@@ -131,12 +136,16 @@ class HTTPRequestHandler(HTTPRequestHandlerBase):
     def update_digsig_data(self) -> None:
         """Update the digital signage data."""
         with TemporaryFile("w+b") as file:
-            copy_file(self.rfile, file, self.content_length, self.chunk_size)
+            copy_file(self.rfile, file, self.content_length)
             LOGGER.debug("Flushing temporary file.")
             file.flush()
             file.seek(0)
 
-            if update(file, self.directory, chunk_size=self.chunk_size):
+            with MANIFEST_LOCK:
+                success = update(file, self.directory)
+                invalidate_manifest()
+
+            if success:
                 text = "System synchronized."
                 status_code = 200
                 self.log_sync()
@@ -146,19 +155,14 @@ class HTTPRequestHandler(HTTPRequestHandlerBase):
                 status_code = 500
                 LOGGER.error(text)
 
-        self.send_data(text, status_code)
+        self.send_text(text, status_code)
 
     def send_manifest(self) -> None:
         """Send the manifest."""
         LOGGER.info("Manifest queried from %s:%s.", *self.remote_socket)
 
-        if (manifest := get_manifest(self.directory, self.chunk_size)) is None:
-            text = "System is currently locked."
-            LOGGER.error(text)
-            self.send_data(text, 503)
-            return
-
-        json = {"manifest": manifest}
+        manifest = get_manifest(self.directory)
+        json = {}
 
         with suppress(NotImplementedError, ValueError):
             json["application"] = get_preferred_application().to_json()
@@ -167,7 +171,7 @@ class HTTPRequestHandler(HTTPRequestHandlerBase):
             json["last_sync"] = last_sync.isoformat()
 
         LOGGER.debug("Sending manifest.")
-        self.send_data(json, 200)
+        self.send_json_object(json, 200, encoded={"manifest": manifest})
 
     def send_screenshot(self) -> None:
         """Send an HTTP screenshot."""
@@ -177,7 +181,7 @@ class HTTPRequestHandler(HTTPRequestHandlerBase):
             payload, content_type, status_code = http_screenshot()
         except Exception as error:
             json = {"message": str(error), "type": str(type(error))}
-            self.send_data(json, 500)
+            self.send_json(json, 500)
             return
 
         self.send_data(payload, status_code, content_type)
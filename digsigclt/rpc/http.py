@@ -1,5 +1,7 @@
 """Wrapper functions to run commands from HTTP requests."""
 
+from threading import Lock
+
 from digsigclt.os import application_set_mode
 from digsigclt.os import application_status
 from digsigclt.os import beep
@@ -14,10 +16,14 @@ from digsigclt.rpc.response import Response
 __all__ = ["COMMANDS", "http_screenshot"]
 
 
+# Serializes commands that change the system state across request threads.
+LOCK = Lock()
+
+
 def http_application(mode: str | None = None) -> Response:
     """Handles the application state."""
 
-    with Response() as response:
+    with LOCK, Response() as response:
         if mode is None:
             response.payload = application_status().to_json()
         else:
@@ -49,7 +55,7 @@ def http_checkupdates() -> Response:
 def http_reboot(delay: int = 0) -> Response:
     """Runs a reboot."""
 
-    with Response("System is rebooting.") as response:
+    with LOCK, Response("System is rebooting.") as response:
         reboot(delay=delay)
 
     return response
@@ -76,7 +82,7 @@ def http_smartctl() -> Response:
 def http_unlock_pacman() -> Response:
     """Removes the pacman lockfile."""
 
-    with Response("Lockfile removed.") as response:
+    with LOCK, Response("Lockfile removed.") as response:
         unlock_pacman()
 
     return response
@@ -20,6 +20,7 @@ ERRORS = {
     ),
     CalledProcessError: lambda error: (str(error), 500),
     CalledProcessErrors: lambda error: (str(error), 500),
+    RuntimeError: lambda error: (str(error), 500),
     UnderAdministration: lambda error: (
         "The system is currently under administration.",
         503,
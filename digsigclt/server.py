@@ -1,6 +1,6 @@
 """HTTP server."""
 
-from http.server import HTTPServer
+from http.server import ThreadingHTTPServer
 from ipaddress import IPv6Address
 from pathlib import Path
 from socket import AF_INET6
@@ -13,8 +13,8 @@ from digsigclt.types import IPAddress, Socket
 __all__ = ["spawn"]
 
 
-class ImprovedHTTPServer(HTTPServer):
-    """A better HTTP server."""
+class ImprovedHTTPServer(ThreadingHTTPServer):
+    """A better, threading HTTP server."""
 
     def __init__(
         self,
@@ -32,10 +32,10 @@ class ImprovedHTTPServer(HTTPServer):
         super().__init__((str(address), port), request_handler, bind_and_activate)
 
 
-def spawn(socket: Socket, directory: Path, chunk_size: int) -> int:
+def spawn(socket: Socket, directory: Path) -> int:
     """Spawn an HTTP server."""
 
-    class _RH(HTTPRequestHandler, chunk_size=chunk_size, directory=directory):
+    class _RH(HTTPRequestHandler, directory=directory):
         """Implementation of the actual request handler."""
 
     httpd = ImprovedHTTPServer(*socket, _RH)
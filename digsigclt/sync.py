@@ -1,101 +1,262 @@
 """Digital signage data synchronization."""
 
-from hashlib import sha256
-from json import loads
-from pathlib import Path
-from tarfile import ReadError, open as tar_open
-from tempfile import TemporaryDirectory
-from typing import IO, Iterable
-
-from digsigclt.common import CHUNK_SIZE, LOGFILE, LOGGER
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from io import UnsupportedOperation
+from json import dumps, loads
+from os import SEEK_SET, DirEntry, lseek, name, scandir, stat_result
+from pathlib import Path, PurePosixPath
+from shutil import which
+from subprocess import PIPE, Popen
+from tarfile import ReadError, TarFile, TarInfo, copyfileobj
+from typing import IO, Iterable, Iterator
+
+from digsigclt.common import LOGFILE, LOGGER, SHA256, sha256sum
 from digsigclt.exceptions import ManifestError
-from digsigclt.types import Manifest
+from digsigclt.types import Fingerprint, Manifest
 
+try:
+    from tarfile import FilterError, data_filter
+except ImportError:  # Extraction filters were added in Python 3.11.4.
+    FilterError = OSError
+    data_filter = None
 
-__all__ = ["gen_manifest", "update"]
+try:
+    from zstandard import ZstdDecompressor, ZstdError
+except ImportError:
+    ZstdDecompressor = None
+    ZstdError = ReadError
 
 
+__all__ = ["fast_manifest", "gen_manifest", "update"]
+
+
+CACHE = ".digsigclt.cache.json"
+EXTRACT_ARGS = {} if data_filter is None else {"filter": data_filter}
 MANIFEST = "manifest.json"
+TAR_BUFSIZE = 128 * 1024  # 128 Kibibytes.
+XZ = which("xz")  # Decompresses on all CPU cores since XZ Utils 5.4.
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_CACHES: dict[Path, dict[str, list]] = {}
 
 
-def get_files(directory: Path, *, basedir: bool = True) -> Iterable[Path]:
-    """Recursively lists files in the given
-    directory, excluding the LOGFILE.
+def get_files(directory: Path) -> Iterable[tuple[str, DirEntry]]:
+    """Recursively yields relative paths and directory
+    entries of files in the given directory, excluding the LOGFILE.
     """
 
-    for inode in directory.iterdir():
-        if basedir and inode.stem.startswith("."):
-            continue  # Ignore dotfiles in the base directory.
+    directories = [(directory, "")]
+
+    while directories:
+        path, prefix = directories.pop()
+
+        with scandir(path) as entries:
+            for entry in entries:
+                if not prefix and entry.name.startswith("."):
+                    continue  # Ignore dotfiles in the base directory.
 
-        if inode.is_dir():
-            yield from get_files(inode, basedir=False)
-        elif inode.is_file() and inode.relative_to(directory) != LOGFILE:
-            yield inode
+                relpath = prefix + entry.name
 
+                if entry.is_dir():
+                    directories.append((entry.path, relpath + "/"))
+                elif entry.is_file() and relpath != LOGFILE.as_posix():
+                    yield relpath, entry
 
-def get_orphans(directory: Path, manifest: set[Path]) -> Iterable[Path]:
+
+def get_orphans(directory: Path, manifest: frozenset[str]) -> Iterable[Path]:
     """Yields files within directory, that are not listed in manifest."""
 
-    for path in get_files(directory):
-        if path.relative_to(directory) not in manifest:
-            yield path
+    for relpath, entry in get_files(directory):
+        if relpath not in manifest:
+            yield Path(entry.path)
+
 
+def unlink_blocking_files(directory: Path, path: Path) -> None:
+    """Removes files that block the creation of the directory path."""
 
-def copy_file(src: Path, dst: Path, *, chunk_size: int = CHUNK_SIZE):
-    """Copies a file from src to dst."""
+    for parent in [path, *path.parents]:
+        if parent == directory or not parent.is_relative_to(directory):
+            return
 
-    with src.open("rb") as src_file, dst.open("wb") as dst_file:
-        while (chunk := src_file.read(chunk_size)) != b"":
-            dst_file.write(chunk)
+        if parent.is_file():
+            LOGGER.debug("Replacing file with directory: %s", parent)
+            parent.unlink()
 
 
-def copy_subfile(src: Path, dst: Path, *, chunk_size: int = CHUNK_SIZE):
-    """Copies a sub-file."""
+def is_cached(member: TarInfo, path: Path, entry: list | None) -> bool:
+    """Check whether the file at path has the archive member's size
+    and the cache entry is valid for the file's current fingerprint.
+    """
 
-    LOGGER.info('Updating file "%s".', dst)
+    if entry is None:
+        return False
 
     try:
-        copy_file(src, dst, chunk_size=chunk_size)
-    except PermissionError:
-        LOGGER.error("Could not override file: %s", dst)
+        stat = path.stat()
+    except OSError:
+        return False
 
+    return stat.st_size == member.size and tuple(entry[:-1]) == get_fingerprint(stat)
 
-def copy_subdir(src: Path, dst: Path, *, chunk_size: int = CHUNK_SIZE):
-    """Copies a subdirectory."""
 
-    if dst.is_file():
-        try:
-            dst.unlink()
-        except PermissionError:
-            LOGGER.error("Could not remove file: %s", dst)
+class HashingReader:
+    """Wraps a file object and hashes the data read from it."""
+
+    def __init__(self, file: IO):
+        self.file = file
+        self.digest = SHA256.copy()
+
+    def read(self, size: int = -1) -> bytes:
+        """Read and hash data from the file."""
+        data = self.file.read(size)
+        self.digest.update(data)
+        return data
+
+    def seek(self, offset: int) -> int:
+        """Seek within the file."""
+        return self.file.seek(offset)
+
+
+class HashingTarFile(TarFile):
+    """A tar file that computes the SHA-256 checksum
+    of regular files while extracting them.
+    """
+
+    checksum = None
+    cached = False
+    changed = True
+
+    def makefile(self, tarinfo: TarInfo, targetpath: str) -> None:
+        """Make a file called targetpath and store its checksum."""
+        if tarinfo.sparse is not None:
+            super().makefile(tarinfo, targetpath)
             return
 
-    if not dst.is_dir():
-        dst.mkdir(mode=0o755, parents=True)
+        fileobj = self.fileobj
+        self.fileobj = reader = HashingReader(fileobj)
+
+        try:
+            if self.cached:
+                self.changed = self.patchfile(tarinfo, targetpath)
+            else:
+                super().makefile(tarinfo, targetpath)
+        finally:
+            self.fileobj = fileobj
+
+        self.checksum = reader.digest.hexdigest()
+
+    def patchfile(self, tarinfo: TarInfo, targetpath: str) -> bool:
+        """Compare the existing file called targetpath with the member's data
+        and overwrite it from the first differing chunk on.
+        Return True if the file was changed.
+        """
+        source = self.fileobj
+        source.seek(tarinfo.offset_data)
+        bufsize = self.copybufsize or TAR_BUFSIZE
+
+        with open(targetpath, "r+b") as target:
+            for offset in range(0, tarinfo.size, bufsize):
+                size = min(bufsize, tarinfo.size - offset)
+
+                if len(data := source.read(size)) < size:
+                    raise ReadError("unexpected end of data")
+
+                if target.read(size) != data:
+                    target.seek(offset)
+                    target.write(data)
+                    size = tarinfo.size - offset - size
+                    copyfileobj(source, target, size, ReadError, bufsize)
+                    target.truncate()
+                    return True
+
+            if target.read(1):
+                target.truncate(tarinfo.size)
+                return True
+
+        return False
+
+
+def check_member(member: TarInfo, directory: Path) -> TarInfo:
+    """Return the member to be extracted, if it
+    stays within the target directory.
+    """
+
+    if data_filter is not None:
+        return data_filter(member, str(directory))
 
-    copy_directory(src, dst, chunk_size=chunk_size)
+    if not (directory / member.name).resolve().is_relative_to(directory.resolve()):
+        raise FilterError(f"{member.name!r} would be extracted outside {directory}")
 
+    return member
 
-def copy_directory(src: Path, dst: Path, *, chunk_size: int = CHUNK_SIZE):
-    """Copies all contents of the source directory src
-    into the destination directory dst, overwriting all files.
+
+def extract_member(
+    tar: HashingTarFile, member: TarInfo, directory: Path, cache: dict[str, list]
+) -> None:
+    """Extracts a single archive member into the directory and
+    updates the cache with the checksums of written files.
     """
 
-    LOGGER.debug("%s -> %s", src, dst)
+    member = check_member(member, directory)
+    relpath = PurePosixPath(member.name).as_posix()
+    path = directory / member.name
+    entry = cache.pop(relpath, None)
 
-    for src_path in src.iterdir():
-        relpath = src_path.relative_to(src)
-        dst_path = dst / relpath
+    if member.isdir():
+        unlink_blocking_files(directory, path)
 
-        if src_path.is_file():
-            copy_subfile(src_path, dst_path, chunk_size=chunk_size)
-        elif src_path.is_dir():
-            copy_subdir(src_path, dst_path, chunk_size=chunk_size)
-        else:
-            LOGGER.warning("Skipping unknown file: %s", src_path)
+    tar.checksum = None
+    tar.cached = member.isfile() and is_cached(member, path, entry)
+    tar.changed = True
 
+    try:
+        tar.extract(member, directory, **EXTRACT_ARGS)
+    except (FileNotFoundError, NotADirectoryError):
+        # Windows raises FileNotFoundError for paths below regular files.
+        unlink_blocking_files(directory, path.parent)
+        tar.extract(member, directory, **EXTRACT_ARGS)
 
-def strip_files(directory: Path, manifest: set[Path]):
+    if tar.checksum is None:
+        return
+
+    cache[relpath] = [*get_fingerprint(path.stat()), tar.checksum]
+
+    if tar.changed:
+        LOGGER.info('Updated file "%s".', path)
+    else:
+        LOGGER.debug('File "%s" is unchanged.', path)
+
+
+def extract(
+    tar: HashingTarFile, directory: Path, cache: dict[str, list]
+) -> frozenset[str]:
+    """Extracts the archive directly into the directory and
+    returns the manifest contained in it.
+
+    The checksums of the written files are stored in the cache,
+    so that the next manifest does not need to hash them again.
+    """
+
+    manifest = None
+
+    for member in tar:
+        if PurePosixPath(member.name).as_posix() == MANIFEST:
+            manifest = load_manifest(tar.extractfile(member))
+            continue
+
+        try:
+            extract_member(tar, member, directory, cache)
+        except (FilterError, OSError) as error:
+            LOGGER.error("Could not extract %s: %s", member.name, error)
+
+    if manifest is None:
+        LOGGER.error("Manifest not found in archive.")
+        raise ManifestError()
+
+    return manifest
+
+
+def strip_files(directory: Path, manifest: frozenset[str]):
     """Removes all files from the directory
     tree, which are not in the manifest.
     """
@@ -111,17 +272,28 @@ def strip_files(directory: Path, manifest: set[Path]):
             LOGGER.error("Could not delete file: %s", path)
 
 
+def is_empty(directory: Path) -> bool:
+    """Check whether the directory is empty."""
+
+    with scandir(directory) as entries:
+        return next(entries, None) is None
+
+
 def strip_tree(directory: Path, *, basedir: bool = True):
     """Remove all empty directory subtrees."""
 
-    for inode in directory.iterdir():
-        if basedir and inode.stem.startswith("."):
-            continue  # Do not remove dotfiles in the base directory.
+    with scandir(directory) as entries:
+        subdirectories = [
+            Path(entry.path)
+            for entry in entries
+            # Do not remove dotfiles in the base directory.
+            if not (basedir and entry.name.startswith(".")) and entry.is_dir()
+        ]
 
-        if inode.is_dir():
-            strip_tree(inode, basedir=False)
+    for subdirectory in subdirectories:
+        strip_tree(subdirectory, basedir=False)
 
-    if basedir or any(directory.iterdir()):
+    if basedir or not is_empty(directory):
         return  # Do not attempt to remove base directory or non-empty dirs.
 
     try:
@@ -132,85 +304,239 @@ def strip_tree(directory: Path, *, basedir: bool = True):
         LOGGER.debug("Removed empty directory: %s", directory)
 
 
-def load_manifest(directory: Path) -> set[Path]:
-    """Read the manifest from the respective directory."""
+def load_manifest(file: IO) -> frozenset[str]:
+    """Read the manifest from the respective file."""
 
-    path = directory / MANIFEST
-    LOGGER.debug("Reading manifest from: %s", path)
-
-    try:
-        with path.open("r") as file:
-            text = file.read()
-    except FileNotFoundError:
-        LOGGER.error("Manifest not found: %s", path)
-        raise ManifestError() from None
+    text = file.read()
 
     try:
         manifest = loads(text)
     except ValueError:
-        LOGGER.error("Manifest is not valid JSON: %s", path)
+        LOGGER.error("Manifest is not valid JSON.")
         LOGGER.debug(text)
         raise ManifestError() from None
 
     if not isinstance(manifest, list):
-        LOGGER.error("Manifest is not a list: %s", path)
+        LOGGER.error("Manifest is not a list.")
         LOGGER.debug(type(manifest))
         LOGGER.debug(manifest)
         raise ManifestError()
 
-    # Remove file to prevent it from being copied
-    # to the digital signage data directory.
-    path.unlink()
-    return {Path(*parts) for parts in manifest}
+    return frozenset("/".join(parts) for parts in manifest)
+
+
+def get_fingerprint(stat: stat_result) -> Fingerprint:
+    """Return a file's fingerprint from its stat result.
+
+    The change time and inode number catch files that were
+    rewritten in place or replaced while keeping size and mtime.
+    The inode number is left out on Windows, where DirEntry.stat()
+    does not provide it, so that it matches the result of Path.stat().
+    """
+
+    inode = 0 if name == "nt" else stat.st_ino
+    return stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns, inode
+
+
+def fast_manifest(directory: Path) -> dict[str, Fingerprint]:
+    """Return a cheap fingerprint of the directory,
+    mapping relative file paths to their fingerprints.
+    """
+
+    return {
+        relpath: get_fingerprint(entry.stat())
+        for relpath, entry in get_files(directory)
+    }
+
+
+def load_cache(directory: Path) -> dict[str, list]:
+    """Return the cached file fingerprints and
+    checksums, reading them from disk on first use.
+    """
+
+    if (cache := _CACHES.get(directory)) is None:
+        cache = _CACHES[directory] = read_cache(directory)
+
+    return cache
+
+
+def read_cache(directory: Path) -> dict[str, list]:
+    """Read the cached file fingerprints and checksums from disk."""
+
+    path = directory / CACHE
+
+    try:
+        cache = loads(path.read_bytes())
+    except FileNotFoundError:
+        return {}
+    except ValueError:
+        LOGGER.warning("Ignoring invalid manifest cache: %s", path)
+        return {}
 
+    if not isinstance(cache, dict):
+        LOGGER.warning("Ignoring invalid manifest cache: %s", path)
+        return {}
 
-def gen_manifest(directory: Path, *, chunk_size: int = CHUNK_SIZE) -> Manifest:
+    return cache
+
+
+def dump_cache(directory: Path, cache: dict[str, list]) -> None:
+    """Store the file fingerprints and checksums."""
+
+    _CACHES[directory] = cache
+    path = directory / CACHE
+
+    try:
+        path.write_text(dumps(cache, separators=(",", ":")), encoding="utf-8")
+    except OSError as error:
+        LOGGER.warning("Could not write manifest cache: %s", error)
+
+
+def hash_files(directory: Path, relpaths: Iterable[str]) -> list[str]:
+    """Return the SHA-256 checksums of the given files using a thread pool.
+    hashlib releases the GIL while hashing, so the files are hashed in parallel.
+    """
+
+    with ThreadPoolExecutor() as executor:
+        return list(
+            executor.map(sha256sum, (directory / relpath for relpath in relpaths))
+        )
+
+
+def gen_manifest(
+    directory: Path, *, fingerprint: dict[str, Fingerprint] | None = None
+) -> Manifest:
     """Generate the manifest of relative
     file paths and their SHA-256 checksums.
+
+    Files whose fingerprint did not change
+    since the last run are not hashed again.
     """
 
-    for filename in get_files(directory):
-        sha256sum = sha256()
+    if fingerprint is None:
+        fingerprint = fast_manifest(directory)
 
-        with filename.open("rb") as file:
-            while (chunk := file.read(chunk_size)) != b"":
-                sha256sum.update(chunk)
+    cache = load_cache(directory)
+    new_cache = {}
+    checksums = {
+        relpath: entry[-1]
+        for relpath, stat in fingerprint.items()
+        if (entry := cache.get(relpath)) and tuple(entry[:-1]) == stat
+    }
 
-        sha256sum = sha256sum.hexdigest()
-        LOGGER.debug("%s  %s", sha256sum, filename)
-        relpath = filename.relative_to(directory)
-        yield relpath.parts, sha256sum
+    if stale := [relpath for relpath in fingerprint if relpath not in checksums]:
+        checksums.update(zip(stale, hash_files(directory, stale)))
 
+    for relpath, stat in fingerprint.items():
+        checksum = checksums[relpath]
+        LOGGER.debug("%s  %s", checksum, relpath)
+        new_cache[relpath] = [*stat, checksum]
+        yield relpath.split("/"), checksum
 
-def update(file: IO, directory: Path, *, chunk_size: int = CHUNK_SIZE) -> bool:
-    """Update the digital signage data
-    from the respective tar.xz archive.
-    """
+    if new_cache != cache:
+        dump_cache(directory, new_cache)
 
-    with TemporaryDirectory() as temp_dir:
-        LOGGER.debug("Extracting archive to: %s", temp_dir := Path(temp_dir))
 
-        with tar_open(mode="r:xz", fileobj=file, bufsize=chunk_size) as tar:
-            try:
-                tar.extractall(path=temp_dir)
-            except EOFError as eof_error:
-                LOGGER.critical(eof_error)
-                return False
-            except ReadError as read_error:
-                LOGGER.critical(read_error)
-                return False
+def has_fileno(file: IO) -> bool:
+    """Check whether the file is backed by a file descriptor."""
 
-        try:
-            manifest = load_manifest(temp_dir)
-        except ManifestError:
-            return False
+    try:
+        file.fileno()
+    except (AttributeError, UnsupportedOperation):
+        return False
+
+    return True
+
+
+@contextmanager
+def xz_stream(file: IO) -> Iterator[IO]:
+    """Decompress an xz stream with the multi-threaded xz program."""
+
+    # Buffered file objects may have read ahead of their logical position.
+    lseek(file.fileno(), file.tell(), SEEK_SET)
 
+    with Popen(
+        [XZ, "--decompress", "--stdout", "--threads=0"],
+        stdin=file,
+        stdout=PIPE,
+        stderr=PIPE,
+    ) as process:
         try:
-            copy_directory(temp_dir, directory, chunk_size=chunk_size)
-        except PermissionError as permission_error:
-            LOGGER.error(permission_error)
-            return False
+            yield process.stdout
+        except BaseException:
+            process.kill()
+            _, stderr = process.communicate()
+
+            # xz may have failed first, e.g. on truncated input.
+            if stderr:
+                LOGGER.error("xz: %s", stderr.decode(errors="replace").strip())
+
+            raise
+
+        # Drain the trailing tar padding, so that xz can terminate.
+        _, stderr = process.communicate()
+
+    if process.returncode != 0:
+        raise ReadError(stderr.decode(errors="replace").strip())
+
+
+@contextmanager
+def open_archive(file: IO) -> Iterator[HashingTarFile]:
+    """Open a tar.xz or tar.zst archive depending on its magic number."""
+
+    magic = file.read(len(ZSTD_MAGIC))
+    file.seek(0)
+
+    if magic == ZSTD_MAGIC:
+        if ZstdDecompressor is None:
+            raise ReadError("Zstandard archives require the zstandard package.")
+
+        stream = ZstdDecompressor().stream_reader(
+            file, closefd=False, read_across_frames=True
+        )
+
+        with HashingTarFile.open(mode="r|", fileobj=stream, bufsize=TAR_BUFSIZE) as tar:
+            yield tar
+    elif XZ is None or not has_fileno(file):
+        with HashingTarFile.open(mode="r:xz", fileobj=file) as tar:
+            yield tar
+    else:
+        with xz_stream(file) as stream, HashingTarFile.open(
+            mode="r|", fileobj=stream, bufsize=TAR_BUFSIZE
+        ) as tar:
+            yield tar
+
+
+def update(file: IO, directory: Path) -> bool:
+    """Update the digital signage data
+    from the respective tar.xz or tar.zst archive.
+
+    The archive is extracted directly into the directory, so an
+    archive that turns out to be corrupt leaves the files extracted
+    up to that point in place and obsolete files are not removed.
+    Callers must therefore only pass complete archives.
+    """
+
+    LOGGER.debug("Extracting archive to: %s", directory)
+
+    cache = dict(load_cache(directory))
+
+    try:
+        with open_archive(file) as tar:
+            manifest = extract(tar, directory, cache)
+    except EOFError as eof_error:
+        LOGGER.critical(eof_error)
+        return False
+    except (ReadError, ZstdError) as read_error:
+        LOGGER.critical(read_error)
+        return False
+    except ManifestError:
+        return False
 
     strip_files(directory, manifest)
     strip_tree(directory)
+    dump_cache(
+        directory,
+        {relpath: entry for relpath, entry in cache.items() if relpath in manifest},
+    )
     return True
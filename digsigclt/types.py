@@ -11,6 +11,7 @@ from typing import Iterator, NamedTuple, Sequence
 __all__ = [
     "ApplicationMode",
     "Command",
+    "Fingerprint",
     "IPAddress",
     "Manifest",
     "Payload",
@@ -20,6 +21,7 @@ __all__ = [
 ]
 
 
+Fingerprint = tuple[int, int, int, int]  # size, mtime, ctime, inode
 IPAddress = IPv4Address | IPv6Address
 Manifest = Iterator[tuple[list[str], str]]
 Payload = None | bytes | str | dict | list | int | float
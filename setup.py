@@ -21,6 +21,7 @@ setup(
         "digsigclt.rpc",
     ],
     install_requires=["netifaces"],
+    extras_require={"zstd": ["zstandard"]},
     entry_points={"console_scripts": ["digsigclt = digsigclt.cli:main"]},
     description="Digital signage data synchronization client.",
 )
@@ -0,0 +1,110 @@
+"""Tests the os/posix/application.py module."""
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from digsigclt.os.posix.application import Applications, UNITS, status
+from digsigclt.os.posix.common import unit_properties
+
+
+MISSING = "ActiveState=inactive\n"
+
+
+def block(state: tuple[str, str] | None) -> str:
+    """Return the systemctl show output block of a unit state.
+    Without --all, the empty UnitFileState of missing units is omitted.
+    """
+
+    if state is None:
+        return MISSING
+
+    unit_file_state, active_state = state
+    return f"ActiveState={active_state}\nUnitFileState={unit_file_state}\n"
+
+
+def show(*states: tuple[str, str] | None) -> str:
+    """Return the output of systemctl show for the given unit states."""
+
+    return "\n".join(map(block, states))
+
+
+class TestUnitProperties(TestCase):
+    """Tests the unit_properties() function."""
+
+    @patch("digsigclt.os.posix.common.check_output")
+    def test_unit_properties(self, check_output):
+        """Tests the parsing of the properties of multiple units."""
+        check_output.return_value = show(("enabled", "active"), None)
+        self.assertEqual(
+            unit_properties(["foo.service", "bar.service"], "UnitFileState"),
+            [
+                {"ActiveState": "active", "UnitFileState": "enabled"},
+                {"ActiveState": "inactive"},
+            ],
+        )
+        check_output.assert_called_once_with(
+            [
+                "/usr/bin/systemctl",
+                "show",
+                "--property=UnitFileState",
+                "--",
+                "foo.service",
+                "bar.service",
+            ],
+            text=True,
+        )
+
+
+class TestStatus(TestCase):
+    """Tests the status() function."""
+
+    def assertStatus(self, output: str, application: Applications) -> None:
+        """Assert that status() returns the application for the output."""
+        with patch("digsigclt.os.posix.common.check_output") as check_output:
+            check_output.return_value = output
+            self.assertIs(status(), application)
+
+        self.assertEqual(check_output.call_args.args[0][-len(UNITS) :], list(UNITS))
+
+    def test_html(self):
+        """Tests the detection of the HTML application."""
+        self.assertStatus(
+            show(
+                ("enabled", "active"),
+                ("disabled", "inactive"),
+                ("disabled", "inactive"),
+                ("disabled", "inactive"),
+            ),
+            Applications.HTML,
+        )
+
+    def test_missing_unit(self):
+        """Tests that missing units do not shift the following units."""
+        self.assertStatus(
+            show(
+                None,
+                ("enabled", "active"),
+                ("disabled", "inactive"),
+                ("disabled", "inactive"),
+            ),
+            Applications.AIR,
+        )
+
+    def test_states(self):
+        """Tests the enabled and active states."""
+        self.assertStatus(
+            show(
+                ("enabled", "failed"),
+                ("disabled", "active"),
+                None,
+                ("enabled-runtime", "reloading"),
+            ),
+            Applications.INSTALLATION_INSTRUCTIONS,
+        )
+
+    def test_off(self):
+        """Tests the detection of no running application."""
+        self.assertStatus(
+            show(None, None, ("masked", "inactive"), ("disabled", "inactive")),
+            Applications.OFF,
+        )
@@ -1,8 +1,11 @@
 """Tests the common.py module."""
 
+from hashlib import sha256
+from io import BytesIO
 from pathlib import Path
-from tempfile import TemporaryFile
+from tempfile import NamedTemporaryFile, TemporaryFile
 from unittest import TestCase
+from unittest.mock import patch
 
 from digsigclt.common import copy_file, sha256sum
 
@@ -19,13 +22,18 @@ class TestCopyFile(TestCase):
     def test_copy_file(self):
         """Tests the copy_file() function."""
         with open("/dev/zero", "rb") as src, TemporaryFile("w+b") as dst:
-            copy_file(src, dst, SIZE, chunk_size=CHUNK_SIZE)
+            copy_file(src, dst, SIZE)
             dst.flush()
             dst.seek(0)
             size = len(dst.read())
 
         self.assertEqual(size, SIZE)
 
+    def test_copy_file_short_read(self):
+        """Tests that copy_file() rejects sources that end prematurely."""
+        with self.assertRaises(EOFError):
+            copy_file(BytesIO(b"foo"), BytesIO(), SIZE)
+
 
 class TestSHA256SUM(TestCase):
     """Tests the sha256sum() function."""
@@ -34,3 +42,23 @@ class TestSHA256SUM(TestCase):
         """Tests the sha256sum() function."""
         self.assertEqual(sha256sum(PATH), SHA256)
         self.assertEqual(sha256sum(str(PATH)), SHA256)
+
+    def test_sha256sum_large_file(self):
+        """Tests the sha256sum() function on a large file."""
+        with NamedTemporaryFile("wb") as file:
+            file.write(bytes(SIZE))
+            file.flush()
+            self.assertEqual(sha256sum(file.name), sha256(bytes(SIZE)).hexdigest())
+
+    @patch("digsigclt.common.file_digest", None)
+    def test_sha256sum_mmap(self):
+        """Tests the sha256sum() function on a memory-mapped file."""
+        self.test_sha256sum_large_file()
+
+    @patch("digsigclt.common.file_digest", None)
+    def test_sha256sum_small_file(self):
+        """Tests the sha256sum() function on files smaller than a page."""
+        self.test_sha256sum()
+
+        with NamedTemporaryFile("wb") as file:
+            self.assertEqual(sha256sum(file.name), sha256().hexdigest())
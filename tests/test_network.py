@@ -0,0 +1,146 @@
+"""Tests the network.py module."""
+
+from ipaddress import IPv4Address, IPv6Address
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+
+from digsigclt.exceptions import NoAddressFound
+
+try:
+    from digsigclt import network
+except ImportError:  # netifaces is not installed.
+    network = None
+
+
+OPENVPN = IPv4Address("10.8.0.42")
+WIREGUARD = IPv6Address("fd56:1dda:8794:cb90::42")
+OTHER = IPv4Address("192.168.0.42")
+
+
+class Clock:
+    """A fake clock that advances when sleeping."""
+
+    def __init__(self):
+        self.time = 0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        """Return the current time."""
+        return self.time
+
+    def sleep(self, seconds: float) -> None:
+        """Advance the time."""
+        self.sleeps.append(seconds)
+        self.time += seconds
+
+
+@skipIf(network is None, "netifaces is not installed")
+class TestGetAddresses(TestCase):
+    """Tests the get_addresses() and is_candidate() functions."""
+
+    def test_is_candidate(self):
+        """Tests that loopback and link-local addresses are skipped."""
+        for address in ["127.0.0.1", "169.254.1.1", "fe80::1%eth0", "::1"]:
+            with self.subTest(address=address):
+                self.assertFalse(network.is_candidate(address))
+
+        for address in [OPENVPN, WIREGUARD, OTHER]:
+            with self.subTest(address=address):
+                self.assertTrue(network.is_candidate(str(address)))
+
+    def test_get_addresses(self):
+        """Tests the enumeration of the interfaces' addresses."""
+        addresses = {
+            "lo": {
+                network.AF_INET: [{"addr": "127.0.0.1"}],
+                network.AF_INET6: [{"addr": "::1"}],
+            },
+            "eth0": {
+                network.AF_INET: [{"addr": str(OTHER)}],
+                network.AF_INET6: [{"addr": "fe80::1%eth0"}],
+            },
+            "tun0": {network.AF_INET: [{"addr": str(OPENVPN)}]},
+            "wg0": {network.AF_INET6: [{"addr": str(WIREGUARD)}]},
+            "down0": {},
+        }
+
+        with patch.multiple(
+            "digsigclt.network",
+            interfaces=lambda: list(addresses),
+            ifaddresses=addresses.get,
+        ):
+            self.assertEqual(list(network.get_addresses()), [OTHER, OPENVPN, WIREGUARD])
+
+
+@skipIf(network is None, "netifaces is not installed")
+class TestGetAddress(TestCase):
+    """Tests the get_address() function."""
+
+    @patch("digsigclt.network.get_addresses")
+    def test_openvpn(self, get_addresses):
+        """Tests that OpenVPN is preferred over WireGuard."""
+        get_addresses.return_value = iter([OTHER, WIREGUARD, OPENVPN])
+        self.assertEqual(network.get_address(), OPENVPN)
+
+    @patch("digsigclt.network.get_addresses")
+    def test_stops_at_openvpn(self, get_addresses):
+        """Tests that the enumeration stops at the first OpenVPN address."""
+
+        def addresses():
+            yield OPENVPN
+            self.fail("Enumerated addresses after OpenVPN.")
+
+        get_addresses.return_value = addresses()
+        self.assertEqual(network.get_address(), OPENVPN)
+
+    @patch("digsigclt.network.get_addresses")
+    def test_wireguard(self, get_addresses):
+        """Tests the fallback to WireGuard."""
+        get_addresses.return_value = iter([OTHER, WIREGUARD])
+        self.assertEqual(network.get_address(), WIREGUARD)
+
+    @patch("digsigclt.network.get_addresses")
+    def test_no_address(self, get_addresses):
+        """Tests that addresses on other networks are not used."""
+        get_addresses.return_value = iter([OTHER])
+        self.assertRaises(NoAddressFound, network.get_address)
+
+
+@skipIf(network is None, "netifaces is not installed")
+class TestDiscoverAddress(TestCase):
+    """Tests the discover_address() function."""
+
+    def setUp(self):
+        """Patches the clock."""
+        self.clock = Clock()
+        patcher = patch.multiple(
+            "digsigclt.network",
+            monotonic=self.clock.monotonic,
+            sleep=self.clock.sleep,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("digsigclt.network.get_addresses")
+    def test_backoff(self, get_addresses):
+        """Tests that the interval between attempts is doubled."""
+        get_addresses.side_effect = [iter([]), iter([]), iter([]), iter([OPENVPN])]
+        self.assertEqual(network.discover_address(), OPENVPN)
+        self.assertEqual(self.clock.sleeps, [1, 2, 4])
+
+    @patch("digsigclt.network.get_addresses")
+    def test_timeout(self, get_addresses):
+        """Tests that the discovery gives up after the timeout."""
+        get_addresses.side_effect = lambda: iter([])
+        self.assertRaises(NoAddressFound, network.discover_address)
+        self.assertEqual(self.clock.sleeps, [1, 2, 4, 8, 16, 29])
+        self.assertEqual(self.clock.time, 60)
+
+    @patch("digsigclt.network.get_addresses")
+    def test_max_interval(self, get_addresses):
+        """Tests that the interval is capped at max_interval."""
+        get_addresses.side_effect = lambda: iter([])
+        self.assertRaises(
+            NoAddressFound, network.discover_address, max_interval=5, timeout=20
+        )
+        self.assertEqual(self.clock.sleeps, [1, 2, 4, 5, 5, 3])
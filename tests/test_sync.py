@@ -0,0 +1,225 @@
+"""Tests the sync.py module."""
+
+from io import BytesIO
+from itertools import product
+from hashlib import sha256
+from json import dumps, loads
+from os import utime
+from os.path import relpath
+from random import randbytes
+from pathlib import Path
+from tarfile import DIRTYPE, TarInfo, data_filter, open as tar_open
+from tempfile import TemporaryDirectory, TemporaryFile
+from typing import Iterable
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+
+try:
+    from zstandard import ZstdCompressor
+except ImportError:
+    ZstdCompressor = None
+
+from digsigclt.common import LOGGER
+from digsigclt.sync import _CACHES, CACHE, XZ, gen_manifest, update
+
+
+SHA256 = "1ab1a2bb8502820a83881a5b66910b819121bafe336d76374637aa4ea7ba2616"
+TESTFILE = Path(__file__).parent.joinpath("testfile.txt")
+
+
+class TestGenManifest(TestCase):
+    """Tests the gen_manifest() function."""
+
+    def setUp(self):
+        """Creates a directory with a test file."""
+        self.tmpd = TemporaryDirectory()
+        self.directory = Path(self.tmpd.name)
+        self.directory.joinpath("sub").mkdir()
+        self.file = self.directory.joinpath("sub", "testfile.txt")
+        self.file.write_bytes(TESTFILE.read_bytes())
+
+    def tearDown(self):
+        """Removes the test directory."""
+        self.tmpd.cleanup()
+
+    def test_gen_manifest(self):
+        """Tests the generated manifest."""
+        manifest = list(gen_manifest(self.directory))
+        self.assertEqual(manifest, [(["sub", "testfile.txt"], SHA256)])
+        self.assertTrue(self.directory.joinpath(CACHE).is_file())
+
+    def test_cached_checksum(self):
+        """Tests that unchanged files are not hashed again."""
+        list(gen_manifest(self.directory))
+        _CACHES[self.directory]["sub/testfile.txt"][-1] = "cached"
+        self.assertEqual(
+            list(gen_manifest(self.directory)), [(["sub", "testfile.txt"], "cached")]
+        )
+
+    def test_rewritten_file(self):
+        """Tests that files rewritten with the same size and mtime are hashed."""
+        list(gen_manifest(self.directory))
+        stat = self.file.stat()
+        self.file.write_bytes(bytes(stat.st_size))
+        utime(self.file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(
+            list(gen_manifest(self.directory)),
+            [(["sub", "testfile.txt"], sha256(bytes(stat.st_size)).hexdigest())],
+        )
+
+
+def make_archive(
+    files: dict[str, bytes], directories: Iterable[str] = (), *, mode: str = "w:xz"
+) -> BytesIO:
+    """Create a tar.xz archive with the given files and their manifest."""
+
+    manifest = dumps([name.split("/") for name in files]).encode()
+    archive = BytesIO()
+
+    with tar_open(mode=mode, fileobj=archive) as tar:
+        for name in directories:
+            info = TarInfo(name)
+            info.type = DIRTYPE
+            tar.addfile(info)
+
+        for name, content in {**files, "manifest.json": manifest}.items():
+            info = TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, BytesIO(content))
+
+    archive.seek(0)
+    return archive
+
+
+class TestUpdate(TestCase):
+    """Tests the update() function."""
+
+    def setUp(self):
+        """Creates a directory with an obsolete file."""
+        self.tmpd = TemporaryDirectory()
+        self.directory = Path(self.tmpd.name)
+        self.directory.joinpath("obsolete", "dir").mkdir(parents=True)
+        self.directory.joinpath("obsolete", "dir", "file.txt").write_bytes(b"old")
+
+    def tearDown(self):
+        """Removes the test directory."""
+        self.tmpd.cleanup()
+
+    def test_update(self):
+        """Tests the update of the directory."""
+        archive = make_archive({"foo.txt": b"foo", "sub/bar.txt": b"bar"})
+        self.assertTrue(update(archive, self.directory))
+        self.assertEqual(self.directory.joinpath("foo.txt").read_bytes(), b"foo")
+        self.assertEqual(self.directory.joinpath("sub/bar.txt").read_bytes(), b"bar")
+        self.assertFalse(self.directory.joinpath("manifest.json").exists())
+        self.assertFalse(self.directory.joinpath("obsolete").exists())
+
+    def test_same_size_and_mtime(self):
+        """Tests that files matching size and mtime are updated."""
+        path = self.directory.joinpath("foo.txt")
+        path.write_bytes(b"bar")
+        utime(path, (0, 0))
+        self.assertTrue(update(make_archive({"foo.txt": b"foo"}), self.directory))
+        self.assertEqual(path.read_bytes(), b"foo")
+
+    def test_cached_file(self):
+        """Tests the update of files with cached checksums."""
+        path = self.directory.joinpath("foo.txt")
+
+        for content in [b"foo", b"foo", b"fob", b"bar"]:
+            with self.subTest(content=content):
+                archive = make_archive({"foo.txt": content})
+                self.assertTrue(update(archive, self.directory))
+                self.assertEqual(path.read_bytes(), content)
+                cache = loads(self.directory.joinpath(CACHE).read_text())
+                self.assertEqual(cache["foo.txt"][-1], sha256(content).hexdigest())
+
+    def test_cached_checksums(self):
+        """Tests that checksums of extracted files are cached."""
+        self.assertTrue(update(make_archive({"foo.txt": b"foo"}), self.directory))
+        cache = loads(self.directory.joinpath(CACHE).read_text())
+        self.assertEqual(cache["foo.txt"][-1], sha256(b"foo").hexdigest())
+
+    def test_file_in_the_way(self):
+        """Tests that files are replaced by directories of the same name."""
+        self.directory.joinpath("sub").write_bytes(b"in the way")
+        self.assertTrue(update(make_archive({"sub/bar.txt": b"bar"}), self.directory))
+        self.assertEqual(self.directory.joinpath("sub/bar.txt").read_bytes(), b"bar")
+
+    def test_directory_outside(self):
+        """Tests that directory members cannot remove files outside."""
+        with TemporaryDirectory() as tmpd:
+            victim = Path(tmpd).joinpath("victim")
+            names = [relpath(victim, self.directory), str(victim)]
+
+            for name, filter_ in product(names, [True, False]):
+                with self.subTest(name=name, filter=filter_):
+                    victim.write_bytes(b"victim")
+                    archive = make_archive({"foo.txt": b"foo"}, [name])
+
+                    with patch.multiple(
+                        "digsigclt.sync",
+                        data_filter=data_filter if filter_ else None,
+                        EXTRACT_ARGS={"filter": data_filter} if filter_ else {},
+                    ):
+                        self.assertTrue(update(archive, self.directory))
+
+                    self.assertEqual(victim.read_bytes(), b"victim")
+
+    @skipIf(ZstdCompressor is None, "zstandard is not installed")
+    def test_zstd_frames(self):
+        """Tests the update from a tar.zst archive with multiple frames."""
+        data = make_archive({"foo.txt": b"foo"}, mode="w").getvalue()
+        half = len(data) // 2
+        archive = BytesIO(
+            ZstdCompressor().compress(data[:half])
+            + ZstdCompressor().compress(data[half:])
+        )
+        self.assertTrue(update(archive, self.directory))
+        self.assertEqual(self.directory.joinpath("foo.txt").read_bytes(), b"foo")
+
+    def test_zstd_unsupported(self):
+        """Tests that tar.zst archives are rejected without zstandard."""
+        archive = BytesIO(b"\x28\xb5\x2f\xfd" + make_archive({}).getvalue())
+
+        with patch("digsigclt.sync.ZstdDecompressor", None):
+            self.assertFalse(update(archive, self.directory))
+
+        self.assertTrue(self.directory.joinpath("obsolete", "dir").is_dir())
+
+    def test_invalid_archive(self):
+        """Tests that invalid archives are rejected."""
+        self.assertFalse(update(BytesIO(b"not an archive"), self.directory))
+        self.assertTrue(self.directory.joinpath("obsolete", "dir").is_dir())
+
+    def test_update_from_file(self):
+        """Tests the update from a file on disk."""
+        with TemporaryFile("w+b") as file:
+            file.write(make_archive({"foo.txt": b"foo"}).getvalue())
+            file.seek(0)
+            self.assertTrue(update(file, self.directory))
+
+        self.assertEqual(self.directory.joinpath("foo.txt").read_bytes(), b"foo")
+
+    @skipIf(XZ is None, "xz is not installed")
+    def test_truncated_archive_file(self):
+        """Tests that errors of xz on truncated archives are logged."""
+        archive = make_archive({"foo.txt": randbytes(1024 * 1024)}).getvalue()
+
+        with TemporaryFile("w+b") as file:
+            file.write(archive[: len(archive) // 2])
+            file.seek(0)
+
+            with self.assertLogs(LOGGER, "ERROR") as logs:
+                self.assertFalse(update(file, self.directory))
+
+        self.assertTrue(any("xz: " in line for line in logs.output))
+
+    def test_invalid_archive_file(self):
+        """Tests that invalid archive files are rejected."""
+        with TemporaryFile("w+b") as file:
+            file.write(b"not an archive")
+            file.seek(0)
+            self.assertFalse(update(file, self.directory))
+
+        self.assertTrue(self.directory.joinpath("obsolete", "dir").is_dir())